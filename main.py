@@ -1,16 +1,39 @@
-from copy import copy
-from copy import deepcopy
-import urllib.request
+import argparse
+import hashlib
+import pickle
+import time
 import re
-import json
+from concurrent.futures import ThreadPoolExecutor
 from fractions import Fraction
+from functools import lru_cache
+from pathlib import Path
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
 
 from recipe import Ingredient, Recipe, Step
-from util import nlp, RecipeSource, VerbType, Transformation
+from util import get_nlp, RecipeSource, VerbType, Transformation
 
 # Global Recipe object to store parsed recipe information
 recipe = Recipe()
 
+# Directory and lifetime (in seconds) of cached parsed recipes
+CACHE_DIR = Path.home() / ".cache" / "recipe_app"
+CACHE_TTL = 24 * 60 * 60
+
+# Seconds to wait on the recipe site before giving up
+FETCH_TIMEOUT = 10
+
+# Number of pages fetched concurrently in batch mode
+FETCH_WORKERS = 4
+
+# HTTP session reused across fetches, so repeated requests to the recipe
+# site skip the DNS lookup and TCP/TLS handshake
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1,
+                                       pool_maxsize=FETCH_WORKERS))
+
 # Common cooking tools to identify in recipe steps
 COMMON_TOOLS = [
     "pan",
@@ -37,6 +60,21 @@ COMMON_TOOLS = [
     "wok",
 ]
 
+# Common tools split into single words and (first, second) word pairs, so
+# that step text can be matched against them by token lookups
+_SINGLE_TOOLS = frozenset(tool for tool in COMMON_TOOLS if " " not in tool)
+_BIGRAM_TOOLS = frozenset(
+    tuple(tool.split()) for tool in COMMON_TOOLS if " " in tool
+)
+_TOKEN_RE = re.compile(r"\w+|\W+")
+
+# Characters replaced with underscores in saved recipe filenames, as a
+# translation table for ASCII titles and a regex for everything else
+_FNAME_TABLE = str.maketrans({
+    c: "_" for c in map(chr, range(128)) if not (c.isalnum() or c == "_")
+})
+_FNAME_RE = re.compile(r"\W")
+
 VEGETARIAN_SUBSTITUTIONS = {
     "chicken broth": "vegetable broth",
     "chicken": "extra-firm tofu, cubed",
@@ -242,6 +280,26 @@ LACTOSE_FREE_SUBSTITUTIONS = {
 
 
 
+def _strip_article(text: str):
+    """
+    Remove a leading article ("a", "an", or "the") and the whitespace after
+    it from a string, without going through the regex engine.
+
+    Args:
+        text (str): The string to strip
+
+    Returns:
+        str: The string without its leading article
+    """
+    start = text[:4].lower()
+    for article in ("the", "an", "a"):
+        if start.startswith(article):
+            rest = text[len(article):]
+            if not rest or not (rest[0].isalnum() or rest[0] == "_"):
+                return rest.lstrip()
+    return text
+
+
 def fetch_url(url):
     """
     Fetch the HTML content of a given URL.
@@ -250,7 +308,7 @@ def fetch_url(url):
         url (str): The URL to fetch
 
     Returns:
-        str: HTML content of the page or empty string if error occurs
+        bytes: Raw HTML content of the page or empty bytes if error occurs
     """
     try:
         # Remove any trailing characters from Slack
@@ -259,81 +317,145 @@ def fetch_url(url):
         # Check that this is an Allrecipes URL
         if RecipeSource.from_url(url) == RecipeSource.UNKNOWN:
             print(f"Error fetching URL: {url} is from an unsupported site.")
-            return ""
+            return b""
 
-        # Open and read the URL
-        response = urllib.request.urlopen(url)
-        data = response.read()
-        html = data.decode("utf-8")
-        return html
+        # Read the URL over the pooled connection, leaving text decoding to
+        # parse_recipe (requests negotiates and undoes gzip compression)
+        response = _SESSION.get(url, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+        return response.content
     except Exception as e:
         print(f"Error fetching URL: {e}")
-        return ""
+        return b""
+
+
+def _extract_landmarks(html):
+    """
+    Locate the title, meta description, and JSON-LD script of a recipe page
+    with plain substring searches instead of regexes over the whole page.
+
+    Args:
+        html (bytes): Raw HTML content of the recipe page
+
+    Returns:
+        tuple[str | None, str | None, bytes | None]: The decoded title and
+            description and the raw JSON-LD payload, or None for each
+            landmark that is not found
+    """
+
+    def between(start_tag, end_tag, pos=0):
+        start = html.find(start_tag, pos)
+        if start == -1:
+            return None
+        start += len(start_tag)
+        end = html.find(end_tag, start)
+        if end == -1:
+            return None
+        return html[start:end]
+
+    title = between(b"<title>", b"</title>")
+    des = between(b'<meta name="description" content="', b'"')
+
+    # Find the first <script> tag carrying the JSON-LD type attribute
+    jsonld = None
+    pos = html.find(b'type="application/ld+json"')
+    while pos != -1:
+        tag_start = html.rfind(b"<script", 0, pos)
+        if tag_start != -1 and b">" not in html[tag_start:pos]:
+            tag_end = html.find(b">", pos)
+            if tag_end != -1:
+                end = html.find(b"</script>", tag_end)
+                if end != -1:
+                    jsonld = html[tag_end + 1:end]
+            break
+        pos = html.find(b'type="application/ld+json"', pos + 1)
+
+    # Only the small title and description windows need to be decoded.
+    # Unlike the old single-line regexes, the slices may span lines, so
+    # collapse whitespace to keep newlines out of titles and filenames
+    if title is not None:
+        title = " ".join(title.decode("utf-8", errors="replace").split())
+    if des is not None:
+        des = " ".join(des.decode("utf-8", errors="replace").split())
+
+    return title, des, jsonld
+
+
+def find_tools(text: str) -> set[str]:
+    """
+    Find the common cooking tools mentioned in a piece of text by tokenizing
+    it once and looking up each word and each space-separated word pair.
+
+    Args:
+        text (str): The text to search, e.g. a recipe step
+
+    Returns:
+        set[str]: The tools mentioned in the text
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    tools = set(_SINGLE_TOOLS.intersection(tokens))
+    tools.update(f"{first} {second}"
+                 for first, sep, second in zip(tokens, tokens[1:], tokens[2:])
+                 if sep == " " and (first, second) in _BIGRAM_TOOLS)
+    return tools
 
 
 def parse_recipe(html):
     """
-    Parse recipe information from HTML using JSON-LD and regex.
+    Parse recipe information from HTML using JSON-LD.
 
     Args:
-        html (str): HTML content of the recipe page
+        html (bytes): Raw HTML content of the recipe page
 
     Returns:
         bool: True if recipe parsing is successful, False otherwise
     """
-    # Extract title
-    title = re.search(r"<title>(.*?)</title>", html)
-
-    # Find JSON-LD script
-    findjson = re.search(
-        r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>', html, re.DOTALL
-    )
+    # Extract title, description, and JSON-LD script
+    title, des, findjson = _extract_landmarks(html)
 
-    if not findjson:
+    if findjson is None:
         print("JSON-LD not found in the HTML.")
         return False
 
     try:
-        # Parse JSON-LD data
-        jsondata = json.loads(findjson.group(1))
+        # Parse JSON-LD data straight from the UTF-8 bytes
+        jsondata = orjson.loads(findjson)
 
         # Handle potential list of JSON objects
         if isinstance(jsondata, list):
             jsondata = jsondata[0] if jsondata else {}
 
         # Populate recipe
-        recipe.title = title.group(1) if title else "Unknown Title"
+        recipe.title = title if title is not None else "Unknown Title"
 
         # Extract description
-        des = re.search(r'<meta name="description" content="(.*?)"', html)
-        recipe.other["description"] = (
-            des.group(1) if des else "No description available"
+        recipe.description = (
+            des if des is not None else "No description available"
         )
 
         # Extract ingredients and steps
-        recipe.ingredients = [Ingredient.from_str(ingr) for ingr in jsondata.get("recipeIngredient", [])]
+        ingredients = jsondata.get("recipeIngredient", [])
+        recipe.ingredients = [
+            Ingredient.from_str(ingr, doc)
+            for ingr, doc in zip(
+                ingredients, get_nlp().pipe(ingredients, batch_size=32)
+            )
+        ]
         recipe.steps = [Step(step["text"]) for step in jsondata.get("recipeInstructions", [])]
         
-        # Identify and update cooking methods and step ingredients
-        update_methods_and_ingredients()
-        
-        # Identify tools used in the recipe
-        for step in recipe.steps:
-            for tool in COMMON_TOOLS:
-                if re.search(rf"\b{tool}\b", step.text, re.IGNORECASE):
-                    step.tools.add(tool)
-                    recipe.tools.add(tool)
+        # Identify and update cooking methods, tools, and step ingredients
+        update_step_details()
 
         return True
 
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"Error decoding JSON: {e}")
         return False
 
-def update_methods_and_ingredients():
+def update_step_details():
     """
-    Identify methods and ingredients used in the recipe steps using spaCy and
-    save to the Step objects and the Recipe.
+    Identify methods, tools, and ingredients used in the recipe steps in a
+    single pass over the steps and save to the Step objects and the Recipe.
     
     Args:
         None
@@ -342,25 +464,43 @@ def update_methods_and_ingredients():
         None
     """
 
-    def match_score(name1: str, name2: str):
-        '''Returns a score of how similar two strings are to each other.'''
+    def match_key(ingr: Ingredient):
+        '''
+        Returns the (name, words, word set) key used to compare an ingredient
+        against others.
+        '''
+
+        name = ' '.join([ingr.descriptors, ingr.name])
+        words = name.lower().split()
+        return name, words, set(words)
 
+    def match_score(key1: tuple, key2: tuple):
+        '''Returns a score of how similar two ingredient keys are.'''
+
+        name1, words1, _ = key1
+        name2, words2, wordset2 = key2
         if not name1 or not name2:
             return 0
         
-        words1 = name1.lower().split()
-        words2 = name2.lower().split()
         if name1 == name2:
             return 2
         elif name1 in name2 or name2 in name1:
             return 1
         else:
-            score = 0
-            for wd in words1:
-                if wd in words2:
-                    score += 1
+            score = sum(wd in wordset2 for wd in words1)
             return score / (max(len(words1), len(words2)) + 1)
 
+    # Keys of the recipe ingredients, computed once rather than per chunk
+    ingredient_keys = [match_key(ringr) if ringr else None
+                       for ringr in recipe.ingredients]
+
+    # Index from each word to the recipe ingredients whose keys contain it
+    word_index: dict[str, set[int]] = {}
+    for i, ringr_key in enumerate(ingredient_keys):
+        if ringr_key:
+            for wd in ringr_key[2]:
+                word_index.setdefault(wd, set()).add(i)
+
     def find_ingredient(ingr: Ingredient):
         '''
         Returns the index of the recipe ingredient corresponding to the given
@@ -372,11 +512,18 @@ def update_methods_and_ingredients():
         
         max_score = 1/2
         ingredients = []
-        for i, ringr in enumerate(recipe.ingredients):
-            if not ringr:
-                continue
-            score = match_score(' '.join([ingr.descriptors, ingr.name]),
-                                ' '.join([ringr.descriptors, ringr.name]))
+        key = match_key(ingr)
+
+        # Only ingredients sharing a word or a substring can reach max_score
+        candidates = set()
+        for wd in key[2]:
+            candidates.update(word_index.get(wd, ()))
+        candidates.update(
+            i for i, ringr_key in enumerate(ingredient_keys)
+            if ringr_key and (key[0] in ringr_key[0] or ringr_key[0] in key[0]))
+
+        for i in sorted(candidates):
+            score = match_score(key, ingredient_keys[i])
             if score > max_score:
                 ingredients = [i]
             elif score == max_score:
@@ -386,26 +533,43 @@ def update_methods_and_ingredients():
             return ingredients[0]
         return -1
 
+    @lru_cache(maxsize=None)
+    def resolve_chunk(text: str):
+        '''
+        Returns the Ingredient parsed from a noun chunk and the index of the
+        matching recipe ingredient, memoized since chunks repeat across steps.
+        '''
+
+        ingr = Ingredient.from_str(text)
+        return ingr, find_ingredient(ingr)
+
     recipe.methods = set()
-    for i, step in enumerate(recipe.steps):
-        doc = nlp(step.text)
-        verbs = [token.lemma_ for token in doc if token.pos_ == "VERB"]
+    inputs = ((step.text, i) for i, step in enumerate(recipe.steps))
+    for doc, i in get_nlp().pipe(inputs, as_tuples=True, batch_size=32):
+        step = recipe.steps[i]
+        tools = find_tools(step.text)
+        step.tools.update(tools)
+        recipe.tools.update(tools)
+        verbs = set()
         for sentence in doc.sents:
+            verbs.update(token.lemma_ for token in sentence
+                         if token.pos_ == "VERB")
             if sentence[0].pos_ in ["NOUN", "PROPN"]:
-                verbs.append(sentence[0].lemma_.lower())
+                verbs.add(sentence[0].lemma_.lower())
+        # verbs is a set, so each distinct verb is classified once per step;
+        # from_str is memoized across steps and lemmatizes inflected forms
+        # spaCy left alone (e.g. a sentence-initial "Baked")
         for verb in verbs:
             if VerbType.from_str(verb) == VerbType.PRIMARY_METHOD:
                 step.methods.add(verb)
                 recipe.methods.add(verb)
         for chunk in doc.noun_chunks:
-            text = re.sub(r'\A(?:a|an|the)\b\s*', '', chunk.text,
-                          flags=re.IGNORECASE)
-            ingr = Ingredient.from_str(text)
-            ingr_ind = find_ingredient(ingr)
+            ingr, ingr_ind = resolve_chunk(_strip_article(chunk.text))
             if ingr_ind > -1:
                 recipe.ingredients[ingr_ind].used.append(
                     (i, len(step.ingredients)))
                 step.ingredients.append(ingr)
+    recipe.nlp_done = True
     return None
 
 
@@ -432,9 +596,89 @@ def get_substitutions(trans: Transformation) -> dict[str, str]:
             return {}
 
 
+def _trie_regex(words) -> str:
+    """
+    Builds a regex source string matching any of the given words, arranged
+    as a character trie so the matcher follows a single branch per character
+    instead of retrying every alternative at each position. Longer words are
+    preferred over their prefixes, as with a longest-first alternation.
+
+    Args:
+        words (Iterable[str]): The literal words to match
+
+    Returns:
+        str: The regex source, matching the lowercased words
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 \
+            else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+@lru_cache(maxsize=None)
+def _subst_engine(trans: Transformation):
+    """
+    Returns the text substitution function for a transformation, built once
+    per transformation type.
+    """
+    substitutions = get_substitutions(trans)
+
+    # One trie-shaped pattern and a lowercase lookup table, so each text is
+    # scanned once instead of once per substitution. The pattern is matched
+    # case-sensitively against lowercased text, which avoids the slower
+    # case-folding comparisons of re.IGNORECASE.
+    source = r"\b(" + _trie_regex(substitutions) + r")\b"
+    pattern = re.compile(source)
+    fallback_pattern = re.compile(source, re.IGNORECASE)
+    table = {k.lower(): v for k, v in substitutions.items()}
+
+    def replace(match: re.Match) -> str:
+        return table[match.group(0).lower()]
+
+    # Step and ingredient texts repeat across recipes and repeated runs of
+    # the same transformation, so results are memoized by text
+    @lru_cache(maxsize=1024)
+    def substitute_text(text: str) -> str:
+        lower = text.lower()
+        if len(lower) != len(text):
+            # Lowercasing moved character offsets, so match the original
+            return fallback_pattern.sub(replace, text)
+        parts = []
+        pos = 0
+        for match in pattern.finditer(lower):
+            parts.append(text[pos:match.start()])
+            parts.append(table[match.group(0)])
+            pos = match.end()
+        if not parts:
+            # No substitution keys in the text
+            return text
+        parts.append(text[pos:])
+        return "".join(parts)
+
+    return substitute_text
+
+
 def handle_transformation(recipe: Recipe, trans: Transformation):
     """Performs a transformation on a recipe, displays it, and saves it."""
 
+    # Transformations only rewrite text and quantities, so they rely on the
+    # methods and ingredients identified when the recipe was parsed rather
+    # than running spaCy again
+    assert recipe.nlp_done, "recipe must be parsed before transforming"
+
     def quantity_change(ingredients, factor):
         for ingredient in ingredients:
             if ingredient and ingredient.quantity:
@@ -442,90 +686,204 @@ def handle_transformation(recipe: Recipe, trans: Transformation):
                     factor = Fraction(factor).limit_denominator()
                 ingredient.quantity *= factor
 
+    # Shallow clones are enough: only quantity, name, and text are replaced,
+    # while the lists and sets inside each object are shared with the source
+    # recipe and never mutated. Pass them to clone_with if they must diverge.
     if trans in [Transformation.DOUBLE, Transformation.HALF]:
         factor = 2 if trans == Transformation.DOUBLE else 0.5
-        transformed_ingredients = deepcopy(recipe.ingredients)
+        transformed_ingredients = [ingredient.clone_with() if ingredient else None
+                                   for ingredient in recipe.ingredients]
         quantity_change(transformed_ingredients, factor)
 
-        transformed_steps = deepcopy(recipe.steps)
+        transformed_steps = [step.clone_with() for step in recipe.steps]
     else:
-        substitutions = get_substitutions(trans)
-        sorted_substitutions = dict(sorted(substitutions.items(), key=lambda x: len(x[0]), reverse=True))
-
-        def substitute_text(text):
-            new_text = text
-            for original, substitute in sorted_substitutions.items():
-                pattern = rf"\b{re.escape(original)}\b"
-                new_text = re.sub(pattern, substitute, new_text, flags=re.IGNORECASE)
-            return new_text
-
-        transformed_ingredients = []
-        for ingredient in recipe.ingredients:
-            if ingredient and ingredient.name:
-                transformed_ingredient = deepcopy(ingredient)
-                transformed_ingredient.name = substitute_text(ingredient.name)
-                transformed_ingredients.append(transformed_ingredient)
-
-        transformed_steps = []
-        for step in recipe.steps:
-            transformed_step = deepcopy(step)
-            transformed_step.text = substitute_text(step.text)
-            transformed_steps.append(transformed_step)
+        substitute_text = _subst_engine(trans)
+
+        transformed_ingredients = [
+            ingredient.clone_with(name=substitute_text(ingredient.name))
+            for ingredient in recipe.ingredients
+            if ingredient and ingredient.name
+        ]
+        transformed_steps = [step.clone_with(text=substitute_text(step.text))
+                             for step in recipe.steps]
 
     transformed_recipe = Recipe()
     transformed_recipe.title = f"{str(trans)} {recipe.title}"
     transformed_recipe.ingredients = transformed_ingredients
     transformed_recipe.steps = transformed_steps
+    # Shared by reference: substitutions don't change cooking tools or verbs
     transformed_recipe.tools = recipe.tools
     transformed_recipe.methods = recipe.methods
+    transformed_recipe.description = recipe.description
     transformed_recipe.other = recipe.other
 
+    # Render the transformed recipe once for both the display and the file
+    transformed_text = str(transformed_recipe)
     print("\nTransformed Recipe:")
-    print(transformed_recipe)
+    print(transformed_text)
 
 
     
-    fname = re.sub(r"\W", "_", transformed_recipe.title.lower()) + ".txt"
-    with open(fname, "w", encoding="utf-8") as file:
-        print(f"Transformation: {str(trans)}", file=file)
-        print("\n---------------------", file=file)
-        print(recipe, file=file)
-        print("\n---------------------", file=file)
-        print(transformed_recipe, file=file)
+    fname = transformed_recipe.title.lower()
+    if fname.isascii():
+        fname = fname.translate(_FNAME_TABLE) + ".txt"
+    else:
+        fname = _FNAME_RE.sub("_", fname) + ".txt"
+    Path(fname).write_text(
+        f"Transformation: {str(trans)}\n"
+        f"\n---------------------\n"
+        f"{recipe}\n"
+        f"\n---------------------\n"
+        f"{transformed_text}\n",
+        encoding="utf-8",
+    )
 
     print(f"\nRecipe saved to {fname}!")
 
 
 
+def _cache_path(url: str) -> Path:
+    """Returns the cache file path for a recipe URL."""
+    key = hashlib.sha1(url.strip(">").encode()).hexdigest()
+    return CACHE_DIR / f"{key}.pkl"
+
+
+def load_cached_recipe(url: str) -> Recipe | None:
+    """
+    Load a previously parsed recipe from the on-disk cache.
+
+    Args:
+        url (str): The recipe URL
+
+    Returns:
+        Recipe | None: The cached recipe, or None if it is missing, expired,
+            or unreadable
+    """
+    path = _cache_path(url)
+    try:
+        if time.time() - path.stat().st_mtime > CACHE_TTL:
+            return None
+        with open(path, "rb") as file:
+            cached = pickle.load(file)
+    except Exception:
+        return None
+    return cached if isinstance(cached, Recipe) else None
+
+
+def save_cached_recipe(url: str, recipe: Recipe):
+    """
+    Save a parsed recipe to the on-disk cache, ignoring any write errors.
+
+    Args:
+        url (str): The recipe URL
+        recipe (Recipe): The parsed recipe
+
+    Returns:
+        None
+    """
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_cache_path(url), "wb") as file:
+            pickle.dump(recipe, file)
+    except Exception as e:
+        print(f"Error caching recipe: {e}")
+
+
+def fetch_many(urls: list[str]) -> list[bytes]:
+    """
+    Fetch several recipe pages concurrently, overlapping their network
+    latency over the shared session's connection pool.
+
+    Args:
+        urls (list[str]): The URLs to fetch
+
+    Returns:
+        list[bytes]: Raw HTML content of each page, in the order of urls,
+            or empty bytes for pages that could not be fetched
+    """
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        return list(executor.map(fetch_url, urls))
+
+
+def parse_batch(urls: list[str]):
+    """
+    Fetch and parse a batch of recipes, saving each to the on-disk cache so
+    that later runs on those URLs skip fetching and parsing.
+
+    Args:
+        urls (list[str]): The recipe URLs
+
+    Returns:
+        None
+    """
+    global recipe
+
+    for url, html in zip(urls, fetch_many(urls)):
+        recipe = Recipe()
+        if html and parse_recipe(html):
+            save_cached_recipe(url, recipe)
+            print(f"Parsed {recipe.title}")
+        else:
+            print(f"Failed to parse {url}")
+
+
 # Example usage
 def main():
+    global recipe
+
+    parser = argparse.ArgumentParser(description="A recipe transformer.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="fetch and parse the recipe even if it is cached")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="fetch, parse, and cache every recipe URL listed "
+                             "in FILE (one per line), then exit")
+    args = parser.parse_args()
+
+    if args.batch:
+        with open(args.batch, encoding="utf-8") as file:
+            parse_batch([line.strip() for line in file if line.strip()])
+        return
+
     url = input("Enter recipe URL: ")
-    html = fetch_url(url)
-    if html and parse_recipe(html):
+    cached = None if args.no_cache else load_cached_recipe(url)
+    if cached:
+        recipe = cached
+        parsed = True
+    else:
+        html = fetch_url(url)
+        parsed = bool(html) and parse_recipe(html)
+        if parsed:
+            save_cached_recipe(url, recipe)
+
+    if parsed:
         print("Recipe parsed successfully!")
         print(recipe)
 
+        # The menu and valid choices never change, so build them once
+        exit_choice = len(Transformation) + 1
+        menu = "\n".join(
+            [f"{i}. Transform to {trans}"
+             for i, trans in enumerate(Transformation, 1)]
+            + [f"{exit_choice}. Exit"]
+        )
+        valid_choices = frozenset(t.value for t in Transformation)
+
         while True:
             print("\nWhat would you like to do?")
-            i = 1
-            for trans in Transformation:
-                print(f"{i}. Transform to {trans}")
-                i += 1
-            print(f"{i}. Exit")
+            print(menu)
 
-            choice = input("Enter your choice: ")
-
-            try:
-                choice = int(choice)
-            except:
-                choice
+            choice = input("Enter your choice: ").strip()
+            if not choice.isdecimal():
+                print("Invalid choice, try again.")
+                continue
+            choice = int(choice)
 
-            if choice in [t.value for t in Transformation]:
+            if choice in valid_choices:
                 trans = Transformation(choice)
                 print(f"\nTransforming to {trans}...")
                 handle_transformation(recipe, trans)
 
-            elif choice == len(Transformation) + 1:
+            elif choice == exit_choice:
                 print("Exiting the transformation menu")
                 break
 
@@ -6,11 +6,14 @@ Modified from code written by Ellen Liao (@ellliao) for Project 2.
 
 from fractions import Fraction
 
-from util import nlp, NounType, str_to_fraction, fraction_to_str
+from util import get_nlp, NounType, str_to_fraction, fraction_to_str
 
 class Ingredient:
     '''Struct holding ingredient information'''
 
+    __slots__ = ('name', 'quantity', 'unit', 'descriptors', 'preparation',
+                 'used')
+
     def __init__(self, name: str = '',
                  quantity: Fraction | None = None,
                  unit: str | None = None):
@@ -40,14 +43,33 @@ class Ingredient:
             ', ' if self.preparation else '',
             self.preparation if self.preparation else ''
         ])
+
+    def clone_with(self, **changes):
+        '''
+        Creates a shallow copy of this ingredient, faster than copy.copy.
+
+        Args:
+            **changes: Attributes to replace in the copy, e.g. name='tofu'.
+
+        Returns:
+            Ingredient: The copy.
+        '''
+
+        clone = Ingredient.__new__(Ingredient)
+        for attr in Ingredient.__slots__:
+            setattr(clone, attr,
+                    changes[attr] if attr in changes else getattr(self, attr))
+        return clone
     
     @classmethod
-    def from_str(cls, name: str):
+    def from_str(cls, name: str, doc=None):
         '''
         Creates an Ingredient object from an input string.
         
         Args:
             name (str): The suspected ingredient string.
+            doc (Doc | None): The string already parsed by SpaCy, e.g. by a
+                batched nlp.pipe call. Parsed here if not given.
         
         Returns:
             Ingredient | None: The corresponding Ingredient object, if
@@ -55,13 +77,18 @@ class Ingredient:
         '''
 
         ingr = Ingredient()
-        doc = nlp(name)
+        if doc is None:
+            doc = get_nlp()(name)
+
+        # Each loop below resumes where the previous one stopped, so the doc
+        # is walked about once overall. Token attributes are read once per
+        # token, since each access goes through a Cython property.
 
         # Find quantity, if available
         i = 0  # token index
         idx = 0  # start char index
         for ind in range(len(doc)):
-            if str_to_fraction(doc[ind].text) == Fraction():
+            if not str_to_fraction(doc[ind].text):
                 i = ind
                 ingr.quantity = str_to_fraction(name[idx:doc[i].idx].strip())
                 idx = doc[i].idx
@@ -70,12 +97,13 @@ class Ingredient:
         # Find unit, if available
         parens = 0
         for ind in range(i, len(doc) - 1):
-            if doc[ind].text == '(':
+            text = doc[ind].text
+            if text == '(':
                 parens += 1
-            elif doc[ind].text == ')':
+            elif text == ')':
                 parens -= 1
             elif parens == 0:
-                if NounType.MEASURE in NounType.from_str(doc[ind].text):
+                if NounType.MEASURE & NounType.from_str(text):
                     i = ind + 1
                     ingr.unit = name[idx:doc[i].idx].strip()
                     idx = doc[i].idx
@@ -83,10 +111,11 @@ class Ingredient:
         
         # Find descriptors, if available
         for ind in range(i, len(doc)):
-            if doc[ind].pos_ in ['NOUN', 'PROPN']:
+            tok = doc[ind]
+            if tok.pos_ in ['NOUN', 'PROPN']:
                 i = ind
-                ingr.descriptors = name[idx:doc[i].idx].strip()
-                idx = doc[i].idx
+                ingr.descriptors = name[idx:tok.idx].strip()
+                idx = tok.idx
                 break
 
         # Find name and check if it's a food item
@@ -94,29 +123,32 @@ class Ingredient:
         parens = 0
         post_punct = False
         for ind in range(i, len(doc)):
-            if doc[ind].text == '(':
+            tok = doc[ind]
+            text = tok.text
+            if text == '(':
                 parens += 1
                 continue
-            elif doc[ind].text == ')':
+            elif text == ')':
                 parens -= 1
                 continue
             elif parens > 0:
                 continue
-            if (doc[ind].pos_ not in ['NOUN', 'PROPN', 'ADJ'] and \
-                doc[ind].dep_ != 'ROOT' and \
-                doc[ind].text != ',') or \
+            pos = tok.pos_
+            if (pos not in ['NOUN', 'PROPN', 'ADJ'] and \
+                tok.dep_ != 'ROOT' and \
+                text != ',') or \
                     (post_punct and \
-                     (doc[ind].pos_ not in ['NOUN', 'PROPN', 'ADJ'] or \
-                      doc[ind].head.i < ind)):
+                     (pos not in ['NOUN', 'PROPN', 'ADJ'] or \
+                      tok.head.i < ind)):
                 i = ind
-                ingr.name = name[idx:doc[i].idx].strip(' .,;:!-')
-                idx = doc[i].idx
+                ingr.name = name[idx:tok.idx].strip(' .,;:!-')
+                idx = tok.idx
                 break
-            if doc[ind].text == ',':
+            if text == ',':
                 post_punct = True
             elif post_punct:
                 post_punct = False
-            if NounType.FOOD in NounType.from_str(doc[ind].text):
+            if NounType.FOOD & NounType.from_str(text):
                 is_food = True
             if is_food and ind == len(doc) - 1:
                 i = ind + 1
@@ -134,6 +166,8 @@ class Ingredient:
 class Step:
     '''Struct holding step information'''
 
+    __slots__ = ('text', 'ingredients', 'tools', 'methods', 'times', 'temps')
+
     def __init__(self, text: str):
         self.text: str = text
         '''Text associated with the step'''
@@ -147,13 +181,35 @@ class Step:
         '''Times mentioned in this step'''
         self.temps: list[str] = []
         '''Temperatures / measures of "doneness" mentioned in this step'''
+
+    def clone_with(self, **changes):
+        '''
+        Creates a shallow copy of this step, faster than copy.copy.
+
+        Args:
+            **changes: Attributes to replace in the copy, e.g. text='Stir.'.
+
+        Returns:
+            Step: The copy.
+        '''
+
+        clone = Step.__new__(Step)
+        for attr in Step.__slots__:
+            setattr(clone, attr,
+                    changes[attr] if attr in changes else getattr(self, attr))
+        return clone
     
 class Recipe:
     '''Struct holding recipe information'''
 
+    __slots__ = ('title', 'description', 'ingredients', 'tools', 'methods',
+                 'steps', 'other', 'nlp_done')
+
     def __init__(self):
         self.title: str = ""
         '''Title of the recipe'''
+        self.description: str = ""
+        '''Description of the recipe'''
         self.ingredients: list[Ingredient] = []
         '''List of ingredients used in the recipe'''
         self.tools: set[str] = set()
@@ -164,6 +220,8 @@ class Recipe:
         '''List of recipe steps'''
         self.other: dict[str, str] = {}
         '''Other miscellaneous recipe information'''
+        self.nlp_done: bool = False
+        '''Whether methods and step ingredients have been identified'''
 
     def __str__(self):
         recipe = []
@@ -5,35 +5,50 @@ Modified from code written by Ellen Liao (@ellliao) for Project 2.
 """
 
 import re
-import spacy
 import unicodedata
 
-from enum import Enum, auto
+from enum import Enum, IntFlag, auto
 from fractions import Fraction
+from functools import lru_cache
 from nltk.corpus import wordnet as wn
 
 #############
 # VARIABLES #
 #############
 
-nlp = spacy.load("en_core_web_sm")
-"""SpaCy model (small)"""
-
 unit_dict = dict(
     [
-        ("ounce", r"(?<=\b|-)oz(?:\.|\b)"),
-        ("pound", r"(?<=\b|-)lb(?:\.|s\b|\b)"),
-        ("gram", r"(?<=\b|-)g(?:\.|\b)"),
-        ("kilogram", r"(?<=\b|-)kg(?:\.|s\b|\b)"),
-        ("teaspoon", r"(?<=\b|-)tsp(?:\.|s\b|\b)"),
-        ("tablespoon", r"(?<=\b|-)tbsp(?:\.|s\b|\b)"),
-        ("gallon", r"(?<=\b|-)gal(?:\.|s\b|\b)"),
-        ("milliliter", r"(?<=\b|-)ml(?:\.|\b)"),
-        ("liter", r"(?<=\b|-)l(?:\.|\b)"),
+        ("ounce", r"oz(?:\.|\b)"),
+        ("pound", r"lb(?:\.|s\b|\b)"),
+        ("gram", r"g(?:\.|\b)"),
+        ("kilogram", r"kg(?:\.|s\b|\b)"),
+        ("teaspoon", r"tsp(?:\.|s\b|\b)"),
+        ("tablespoon", r"tbsp(?:\.|s\b|\b)"),
+        ("gallon", r"gal(?:\.|s\b|\b)"),
+        ("milliliter", r"ml(?:\.|\b)"),
+        ("liter", r"l(?:\.|\b)"),
     ]
 )
 """Dict of common unit abbreviation patterns"""
 
+unit_names = tuple(unit_dict)
+"""Unit names, in the same order as the groups of unit_re"""
+
+unit_re = re.compile(
+    r"(?:\b|(?<=-))(?:" + "|".join(f"({p})" for p in unit_dict.values()) + ")",
+    re.IGNORECASE,
+)
+"""Compiled pattern matching any unit abbreviation, one group per unit"""
+
+fraction_re = re.compile(r"[-+]?(?=\.?\d)\d*(?:/\d+|\.\d*)?")
+"""Compiled pattern of number tokens that str_to_fraction can parse"""
+
+fraction_slash_table = str.maketrans({"⁄": "/"})
+"""Translation table replacing the fraction slash (U+2044) with '/'"""
+
+recipe_url_part = "allrecipes.com/recipe/"
+"""Substring found in every supported recipe URL"""
+
 #########
 # ENUMS #
 #########
@@ -47,50 +62,42 @@ class RecipeSource(Enum):
 
     @classmethod
     def from_url(cls, url: str):
-        if re.findall(r"allrecipes\.com/recipe/.*", url):
+        if recipe_url_part in url:
             return RecipeSource.ALLRECIPES
         return RecipeSource.UNKNOWN
 
 
-class NounType(Enum):
-    """Enum of relevant noun types"""
+class NounType(IntFlag):
+    """Flags of relevant noun types; a noun may be several at once"""
 
-    UNKNOWN = auto()
-    FOOD = auto()
-    MEASURE = auto()
-    TEMPERATURE = auto()
-    TOOL = auto()
+    UNKNOWN = 0
+    FOOD = 1
+    MEASURE = 2
+    TEMPERATURE = 4
+    TOOL = 8
 
     @classmethod
+    @lru_cache(maxsize=4096)
     def from_str(cls, noun: str):
-        ntypes = set()
+        ntypes = NounType.UNKNOWN
+        every_type = (NounType.FOOD | NounType.MEASURE | NounType.TEMPERATURE
+                      | NounType.TOOL)
+        targets = target_synsets()
         sets = wn.synsets(noun, wn.NOUN)
         for s in sets:
-            for ss in s.hypernym_paths():
-                if (
-                    wn.synset("kitchen_utensil.n.01") in ss
-                    or wn.synset("kitchen_appliance.n.01") in ss
-                    or wn.synset("container.n.01") in ss
-                ):
-                    ntypes.add(NounType.TOOL)
-                if wn.synset('measure.n.02') in ss or \
-                    wn.synset('container.n.01') in ss or \
-                    wn.synset('clove.n.03') in ss or \
-                    wn.synset('branchlet.n.01') in ss or \
-                    noun in ['stalk', 'stick']:
-                    ntypes.add(NounType.MEASURE)
-                if wn.synset('food.n.01') in ss or \
-                    wn.synset('food.n.02') in ss or \
-                    wn.synset('leaven.n.01') in ss or \
-                    wn.synset('plant_organ.n.01') in ss or \
-                    wn.synset('powder.n.01') in ss:
-                    ntypes.add(NounType.FOOD)
-                if (
-                    wn.synset("temperature.n.01") in ss
-                    or wn.synset("fire.n.03") in ss
-                    or wn.synset("temperature_unit.n.01") in ss
-                ):
-                    ntypes.add(NounType.TEMPERATURE)
+            ancestors = synset_ancestors(s)
+            if not targets["tool"].isdisjoint(ancestors):
+                ntypes |= NounType.TOOL
+            if not targets["measure"].isdisjoint(ancestors) or \
+                noun in ['stalk', 'stick']:
+                ntypes |= NounType.MEASURE
+            if not targets["food"].isdisjoint(ancestors):
+                ntypes |= NounType.FOOD
+            if not targets["temperature"].isdisjoint(ancestors):
+                ntypes |= NounType.TEMPERATURE
+            if ntypes == every_type:
+                # Nothing left to add
+                break
         return ntypes
 
 
@@ -102,14 +109,14 @@ class VerbType(Enum):
     OTHER_METHOD = auto()
 
     @classmethod
+    @lru_cache(maxsize=4096)
     def from_str(cls, verb: str):
         sets = wn.synsets(verb, wn.VERB)
         if verb == "cook":
             return VerbType.UNKNOWN
         for s in sets:
-            for ss in s.hypernym_paths():
-                if wn.synset("cook.v.03") in ss:
-                    return VerbType.PRIMARY_METHOD
+            if target_synsets()["cook"] in synset_ancestors(s):
+                return VerbType.PRIMARY_METHOD
         return VerbType.UNKNOWN
 
 
@@ -128,28 +135,22 @@ class Transformation(Enum):
     LACTOSE_FREE = auto()
 
     def __str__(self):
-        match self:
-            case Transformation.TO_VEGETARIAN:
-                return "Vegetarian"
-            case Transformation.FROM_VEGETARIAN:
-                return "Non-Vegetarian"
-            case Transformation.TO_HEALTHY:
-                return "Healthy"
-            case Transformation.FROM_HEALTHY:
-                return "Unhealthy"
-            case Transformation.DOUBLE:
-                return "Double"
-            case Transformation.HALF:
-                return "Half"
-            case Transformation.TO_ITALIAN:
-                return "Italian Style"
-            case Transformation.TO_MEXICAN:
-                return "Mexican Style"
-            case Transformation.GLUTEN_FREE:
-                return "Gluten Free"
-            case Transformation.LACTOSE_FREE:
-                return "Lactose Free"
-        return None
+        return transformation_names.get(self)
+
+
+transformation_names = {
+    Transformation.TO_VEGETARIAN: "Vegetarian",
+    Transformation.FROM_VEGETARIAN: "Non-Vegetarian",
+    Transformation.TO_HEALTHY: "Healthy",
+    Transformation.FROM_HEALTHY: "Unhealthy",
+    Transformation.DOUBLE: "Double",
+    Transformation.HALF: "Half",
+    Transformation.TO_ITALIAN: "Italian Style",
+    Transformation.TO_MEXICAN: "Mexican Style",
+    Transformation.GLUTEN_FREE: "Gluten Free",
+    Transformation.LACTOSE_FREE: "Lactose Free",
+}
+"""Display name of each transformation"""
 
 
 #############
@@ -157,40 +158,107 @@ class Transformation(Enum):
 #############
 
 
+@lru_cache(maxsize=None)
+def target_synsets():
+    """
+    Gets the WordNet synsets that NounType.from_str and VerbType.from_str
+    look for among a word's hypernyms.
+
+    Built on first use rather than at import, so that runs which never
+    classify a word (e.g. --help, or cache hits) don't load WordNet.
+
+    Returns:
+        dict: "cook" maps to the synset whose hyponyms are primary cooking
+            methods; "tool", "measure", "food" and "temperature" map to the
+            frozenset of hypernyms marking the matching NounType.
+    """
+
+    def synsets(*names):
+        return frozenset(map(wn.synset, names))
+
+    return {
+        "cook": wn.synset("cook.v.03"),
+        "tool": synsets("kitchen_utensil.n.01", "kitchen_appliance.n.01",
+                        "container.n.01"),
+        "measure": synsets("measure.n.02", "container.n.01", "clove.n.03",
+                           "branchlet.n.01"),
+        "food": synsets("food.n.01", "food.n.02", "leaven.n.01",
+                        "plant_organ.n.01", "powder.n.01"),
+        "temperature": synsets("temperature.n.01", "fire.n.03",
+                               "temperature_unit.n.01"),
+    }
+
+
+@lru_cache(maxsize=None)
+def synset_ancestors(synset):
+    """
+    Gets a synset and all of its (instance) hypernyms, up to the root.
+
+    This is the union of synset.hypernym_paths(), memoized per synset so
+    shared ancestors are walked once for the whole run.
+    """
+
+    return frozenset([synset]).union(
+        *map(synset_ancestors, synset.hypernyms() + synset.instance_hypernyms())
+    )
+
+
+@lru_cache(maxsize=None)
+def get_nlp():
+    """
+    Loads the SpaCy model (small), without the unused named entity recognizer.
+
+    The model is loaded on first use only, so runs that never parse a recipe
+    (e.g. --help, or ones served entirely from the cache) skip the load.
+    Together with target_synsets(), importing util loads neither SpaCy nor
+    WordNet.
+    """
+
+    import spacy
+
+    return spacy.load("en_core_web_sm", exclude=["ner"])
+
+
 def standardize_units(string: str):
     "Un-abbreviate all cooking units in a given string"
-    for unit in unit_dict:
-        string = re.sub(unit_dict[unit], unit, string, flags=re.IGNORECASE)
-    return string
+    return unit_re.sub(lambda m: unit_names[m.lastindex - 1], string)
 
 
+@lru_cache(maxsize=4096)
 def str_to_fraction(data: str):
-    sum = Fraction()
-    table = str.maketrans({"⁄": "/"})
-    data = unicodedata.normalize("NFKD", data).translate(table).split()
+    # Accumulate as plain ints and normalize once, instead of a gcd per add
+    num, den = 0, 1
+    # NFKD (e.g. "½" to "1⁄2") and the fraction slash only involve non-ASCII
+    if not data.isascii():
+        data = unicodedata.normalize("NFKD", data)
+        data = data.translate(fraction_slash_table)
+    data = data.split()
     for val in data:
+        # Plain whole numbers are the common case and need no Fraction parse
+        if val.isdecimal():
+            num += int(val) * den
+            continue
+        if not fraction_re.fullmatch(val):
+            continue
         try:
             f = Fraction(val)
-            if f.denominator > 1 and f.numerator > 10:
-                f = Fraction(
-                    f.numerator % 10 + int(f.numerator / 10) * f.denominator,
-                    f.denominator,
-                )
-            sum += f
-        except:
+        except ZeroDivisionError:
             continue
-    return sum
+        n, d = f.numerator, f.denominator
+        if d > 1 and n > 10:
+            # A mixed number whose space was lost, e.g. "11/2" for "1 1/2"
+            whole, n = divmod(n, 10)
+            n += whole * d
+        num, den = num * d + n * den, den * d
+    return Fraction(num, den)
 
 
 def fraction_to_str(frac: Fraction):
     if frac.denominator == 1:
         return str(frac.numerator)
     elif frac.numerator >= frac.denominator:
-        return " ".join(
-            [
-                str(frac.numerator // frac.denominator),
-                str(Fraction(frac.numerator % frac.denominator, frac.denominator)),
-            ]
-        )
+        # Fractions are kept in lowest terms, so the remainder part is too
+        whole, rem = divmod(frac.numerator, frac.denominator)
+        return f"{whole} {rem}/{frac.denominator}"
     else:
         return str(frac)